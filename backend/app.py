@@ -1,13 +1,44 @@
+import atexit
+import os
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from services.scraper_service import ScraperService
+from services.request_coalescer import RequestCoalescer
+from sinks.factory import create_sink
+from utils.helpers import env_flag
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": [
     "https://habib-153.github.io",  
     "http://localhost:5173"         
 ]}})
-scraper_service = ScraperService()
+
+# Optional result export, e.g. SCRAPER_SINK=jsonl SCRAPER_SINK_DIR=./output
+sink = None
+if os.environ.get('SCRAPER_SINK'):
+    sink = create_sink(
+        os.environ['SCRAPER_SINK'],
+        os.environ.get('SCRAPER_SINK_DIR', 'output'),
+        batch_size=int(os.environ.get('SCRAPER_SINK_BATCH_SIZE', 500)),
+        max_queue=int(os.environ.get('SCRAPER_SINK_MAX_QUEUE', 10000)),
+        # Seconds a scrape waits on a full queue before its result is dropped
+        put_timeout=float(os.environ.get('SCRAPER_SINK_PUT_TIMEOUT', 5)),
+        # Seconds before the current file is rotated and becomes readable
+        max_age_seconds=float(os.environ.get('SCRAPER_SINK_MAX_AGE', 60))
+    )
+
+# Request coalescing, e.g. COALESCE_TIMEOUT=10 COALESCE_SORT_QUERY=false
+# Only requests in flight in the same process are shared, so this needs a
+# threaded server (see --threads in Procfile/render.yaml)
+coalescer = RequestCoalescer(
+    timeout=float(os.environ.get('COALESCE_TIMEOUT', 30)),
+    sort_query=env_flag('COALESCE_SORT_QUERY', True),
+    strip_fragment=env_flag('COALESCE_STRIP_FRAGMENT', True),
+    enabled=env_flag('COALESCE_ENABLED', True)
+)
+
+scraper_service = ScraperService(coalescer=coalescer, sink=sink)
+atexit.register(scraper_service.close)
 
 
 @app.route('/', methods=['GET'])
@@ -16,7 +47,9 @@ def index():
         "status": "online",
         "message": "Web Scraper API is running",
         "endpoints": {
-            "/scrape": "POST - Scrape a website or API"
+            "/scrape": "POST - Scrape a website or API",
+            "/rules": "GET - List extraction rule sets, POST - Register a rule set",
+            "/stats": "GET - Scraper service counters"
         }
     })
 
@@ -26,11 +59,29 @@ def scrape():
     data = request.json
     scrape_request = {
         'type': data.get('type'),
-        'url': data.get('url')
+        'url': data.get('url'),
+        'rules': data.get('rules')
     }
     result = scraper_service.scrape(scrape_request)
     return jsonify(result)
 
 
+@app.route('/rules', methods=['GET'])
+def list_rules():
+    return jsonify(scraper_service.list_rules())
+
+
+@app.route('/rules', methods=['POST'])
+def register_rules():
+    data = request.json
+    result = scraper_service.register_rules(data.get('name'), data, replace=data.get('replace') is True)
+    return jsonify(result)
+
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    return jsonify(scraper_service.get_stats())
+
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,334 @@
+import re
+import threading
+from collections import OrderedDict
+
+import soupsieve
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # XPath rules are only available when lxml is installed
+    etree = None
+    lxml_html = None
+
+# Regexes run server-side in the request thread. The length cap does not stop
+# catastrophic backtracking (e.g. '(a+)+$'), which is a known risk, so regexes
+# are only accepted in rule sets registered through /rules, not inline ones.
+MAX_REGEX_LENGTH = 200
+
+
+class SelectorCache:
+    """LRU cache of compiled CSS selectors and XPath expressions"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def _compile(self, kind, expression):
+        if kind == 'css':
+            try:
+                return soupsieve.compile(expression)
+            except soupsieve.SelectorSyntaxError as e:
+                raise ValueError(f"Invalid CSS selector '{expression}': {e}")
+        if kind == 'xpath':
+            if etree is None:
+                raise ValueError("XPath rules require lxml to be installed.")
+            try:
+                return etree.XPath(expression)
+            except etree.XPathSyntaxError as e:
+                raise ValueError(f"Invalid XPath expression '{expression}': {e}")
+        raise ValueError(f"Unknown selector type '{kind}'. Use 'css' or 'xpath'.")
+
+    def get(self, kind, expression):
+        key = (kind, expression)
+        with self._lock:
+            compiled = self._cache.get(key)
+            if compiled is not None:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return compiled
+
+        # Compile outside the lock, a duplicate compile is cheaper than contention
+        compiled = self._compile(kind, expression)
+
+        with self._lock:
+            self._misses += 1
+            self._cache[key] = compiled
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return compiled
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'size': len(self._cache),
+                'maxsize': self.maxsize,
+                'hits': self._hits,
+                'misses': self._misses
+            }
+
+
+def _selector_from_spec(spec):
+    """Return the (kind, expression) pair of a selector spec"""
+    if isinstance(spec, str):
+        return 'css', spec
+    if not isinstance(spec, dict):
+        raise ValueError("Selector must be a CSS string or an object with 'css' or 'xpath'.")
+    if spec.get('css') and spec.get('xpath'):
+        raise ValueError("Selector cannot define both 'css' and 'xpath'.")
+    for kind in ('css', 'xpath'):
+        expression = spec.get(kind)
+        if expression:
+            if not isinstance(expression, str):
+                raise ValueError(f"Selector '{kind}' must be a string.")
+            return kind, expression
+    raise ValueError("Selector must define 'css' or 'xpath'.")
+
+
+class ExtractionRule:
+    def __init__(self, name, kind, selector, extract='text', regex=None, multiple=False):
+        self.name = name
+        self.kind = kind
+        self.selector = selector
+        self.multiple = multiple
+        self.regex = None
+        self.attribute = None
+        # ':scope' must refer to the node the rule runs against, which only select() supports
+        self.scoped = kind == 'css' and ':scope' in selector.pattern
+
+        if extract in ('text', 'html'):
+            self.extract = extract
+        elif isinstance(extract, str) and extract.startswith('attr:') and len(extract) > 5:
+            self.extract = 'attr'
+            self.attribute = extract[5:]
+        else:
+            raise ValueError(
+                f"Invalid extract '{extract}' for field '{name}'. Use 'text', 'html' or 'attr:<name>'.")
+
+        if regex:
+            if not isinstance(regex, str):
+                raise ValueError(f"Regex for field '{name}' must be a string.")
+            if len(regex) > MAX_REGEX_LENGTH:
+                raise ValueError(f"Regex for field '{name}' is longer than {MAX_REGEX_LENGTH} characters.")
+            try:
+                self.regex = re.compile(regex)
+            except re.error as e:
+                raise ValueError(f"Invalid regex for field '{name}': {e}")
+
+    @classmethod
+    def from_spec(cls, name, spec, cache, allow_regex=True):
+        kind, expression = _selector_from_spec(spec)
+        options = spec if isinstance(spec, dict) else {}
+        if options.get('regex') and not allow_regex:
+            raise ValueError(f"Regex for field '{name}' is only allowed in registered rule sets.")
+        multiple = options.get('multiple', False)
+        if not isinstance(multiple, bool):
+            raise ValueError(f"'multiple' for field '{name}' must be true or false.")
+        return cls(
+            name,
+            kind,
+            cache.get(kind, expression),
+            extract=options.get('extract', 'text'),
+            regex=options.get('regex'),
+            multiple=multiple
+        )
+
+    def value(self, match):
+        """Turn a single selector match into a string value"""
+        if self.kind == 'css':
+            if self.extract == 'text':
+                value = match.get_text()
+            elif self.extract == 'html':
+                value = str(match)
+            else:
+                value = match.get(self.attribute)
+                if isinstance(value, list):
+                    value = ' '.join(value)
+        elif isinstance(match, lxml_html.HtmlElement):
+            if self.extract == 'text':
+                value = match.text_content()
+            elif self.extract == 'html':
+                value = lxml_html.tostring(match, encoding='unicode')
+            else:
+                value = match.get(self.attribute)
+        elif isinstance(match, etree._Element):
+            # Comments and processing instructions only carry text
+            value = match.text
+        else:
+            # Text, attribute or scalar XPath results
+            value = str(match)
+
+        if value is None:
+            return None
+        value = re.sub(r'\s+', ' ', value.strip())
+
+        if self.regex:
+            found = self.regex.search(value)
+            if not found:
+                return None
+            value = found.group(1) if self.regex.groups else found.group(0)
+        return value
+
+    def apply(self, node):
+        """Evaluate an XPath rule against node"""
+        matches = self.selector(node)
+        if not isinstance(matches, list):
+            matches = [matches]
+        return self.collect(matches)
+
+    def collect(self, matches):
+        """Turn the matches of this rule into its field value"""
+        values = [v for v in (self.value(m) for m in matches) if v is not None]
+        if self.multiple:
+            return values
+        return values[0] if values else None
+
+
+class RuleSet:
+    def __init__(self, name, rules, items=None):
+        self.name = name
+        self.rules = rules
+        # Optional (kind, compiled) selector; each match becomes one record
+        self.items = items
+
+        kinds = {rule.kind for rule in rules}
+        if items is not None:
+            kinds.add(items[0])
+            if len(kinds) > 1:
+                raise ValueError("Fields of an item rule set must use the same selector type as 'items'.")
+        self.uses_css = 'css' in kinds
+        self.uses_xpath = 'xpath' in kinds
+
+    @classmethod
+    def from_dict(cls, spec, cache, name=None, allow_regex=True):
+        """Build and compile a rule set from its JSON definition"""
+        if not isinstance(spec, dict):
+            raise ValueError("Rule set must be an object.")
+        fields = spec.get('fields')
+        if not isinstance(fields, dict) or not fields:
+            raise ValueError("Rule set must define at least one field in 'fields'.")
+
+        rules = [ExtractionRule.from_spec(field, field_spec, cache, allow_regex=allow_regex)
+                 for field, field_spec in fields.items()]
+
+        items = None
+        if spec.get('items'):
+            kind, expression = _selector_from_spec(spec['items'])
+            items = (kind, cache.get(kind, expression))
+
+        if name is None and isinstance(spec.get('name'), str):
+            name = spec['name']
+        return cls(name or 'inline', rules, items)
+
+    def describe(self):
+        return {
+            'name': self.name,
+            'fields': [rule.name for rule in self.rules],
+            'has_items': self.items is not None
+        }
+
+    def _apply_css(self, node):
+        """Match the CSS rules against the descendants of node in a single traversal"""
+        rules = [rule for rule in self.rules if rule.kind == 'css']
+        values = {rule.name: rule.collect(rule.selector.select(node)) for rule in rules if rule.scoped}
+        pending = [rule for rule in rules if not rule.scoped]
+        for rule in pending:
+            values[rule.name] = [] if rule.multiple else None
+
+        for element in node.descendants:
+            if not pending:
+                break
+            if not isinstance(element, Tag):
+                continue
+            found = False
+            for rule in pending:
+                if not rule.selector.match(element):
+                    continue
+                value = rule.value(element)
+                if value is None:
+                    continue
+                if rule.multiple:
+                    values[rule.name].append(value)
+                else:
+                    values[rule.name] = value
+                    found = True
+            if found:
+                # Single-value rules stop at their first non-empty value
+                pending = [rule for rule in pending if rule.multiple or values[rule.name] is None]
+
+        return values
+
+    def _apply(self, roots):
+        record = {}
+        if 'css' in roots:
+            record.update(self._apply_css(roots['css']))
+        if 'xpath' in roots:
+            record.update({rule.name: rule.apply(roots['xpath'])
+                           for rule in self.rules if rule.kind == 'xpath'})
+        # Keep the field order of the rule set
+        return {rule.name: record[rule.name] for rule in self.rules}
+
+    def extract(self, html_text, html_bytes=None):
+        """Parse the document once per selector type and evaluate every rule over it"""
+        roots = {}
+        if self.uses_css:
+            roots['css'] = BeautifulSoup(html_text, 'html.parser')
+        if self.uses_xpath:
+            roots['xpath'] = lxml_html.fromstring(html_bytes if html_bytes is not None else html_text)
+
+        if self.items is None:
+            return [self._apply(roots)]
+
+        kind, selector = self.items
+        if kind == 'css':
+            nodes = selector.select(roots['css'])
+        else:
+            nodes = [n for n in selector(roots['xpath']) if isinstance(n, lxml_html.HtmlElement)]
+
+        return [self._apply({kind: node}) for node in nodes]
+
+
+class RuleRegistry:
+    """Named rule sets registered server-side and compiled once"""
+
+    def __init__(self, cache=None, max_rule_sets=100):
+        self.cache = cache or SelectorCache()
+        self.max_rule_sets = max_rule_sets
+        self._lock = threading.Lock()
+        self._rule_sets = {}
+
+    def register(self, name, spec, replace=False):
+        if not name or not isinstance(name, str):
+            raise ValueError("Rule set name is required and must be a string.")
+        rule_set = RuleSet.from_dict(spec, self.cache, name=name)
+        with self._lock:
+            if name in self._rule_sets:
+                if not replace:
+                    raise ValueError(f"Rule set '{name}' already exists. Pass 'replace': true to overwrite it.")
+            elif len(self._rule_sets) >= self.max_rule_sets:
+                raise ValueError(f"Cannot register more than {self.max_rule_sets} rule sets.")
+            self._rule_sets[name] = rule_set
+        return rule_set
+
+    def get(self, name):
+        with self._lock:
+            return self._rule_sets.get(name)
+
+    def list(self):
+        with self._lock:
+            return [rule_set.describe() for rule_set in self._rule_sets.values()]
+
+    def resolve(self, rules):
+        """Return a RuleSet for a registered name or an inline definition"""
+        if isinstance(rules, str):
+            rule_set = self.get(rules)
+            if rule_set is None:
+                raise ValueError(f"Unknown rule set '{rules}'.")
+            return rule_set
+        return RuleSet.from_dict(rules, self.cache, allow_regex=False)
@@ -214,7 +214,30 @@ class WebScraper:
 
         return structure
 
-    def scrape(self, url, max_elements=1000):
+    def extract_with_rules(self, response, rule_set, url, processing_time):
+        """Return only the records produced by a rule set, skipping the full-page extractors"""
+        records = rule_set.extract(response.text, response.content)
+
+        return {
+            "success": True,
+            "data": {
+                "url": url,
+                "rule_set": rule_set.name,
+                "records": records
+            },
+            "analytics": {
+                'records_count': len(records),
+                'fields_count': len(rule_set.rules),
+                'processing_time_seconds': round(processing_time, 2),
+                'extraction_time_seconds': round(time.time() - self.start_time - processing_time, 2),
+                'status_code': response.status_code,
+                'content_type': response.headers.get('Content-Type', ''),
+                'page_size_bytes': len(response.content)
+            },
+            "type": "static"
+        }
+
+    def scrape(self, url, max_elements=1000, rule_set=None):
         try:
             self.start_time = time.time()
 
@@ -228,6 +251,9 @@ class WebScraper:
             processing_time = time.time() - self.start_time
 
             if response.status_code == 200:
+                if rule_set is not None:
+                    return self.extract_with_rules(response, rule_set, url, processing_time)
+
                 # Parse HTML
                 soup = BeautifulSoup(response.text, 'html.parser')
 
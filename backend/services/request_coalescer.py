@@ -0,0 +1,126 @@
+import json
+import threading
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url, sort_query=True, strip_fragment=True):
+    """Normalize a URL so equivalent spellings map to the same key"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+
+    # Drop the port when it is the scheme default
+    netloc = host
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        netloc = f"{host}:{parts.port}"
+    if parts.username:
+        userinfo = parts.username
+        if parts.password:
+            userinfo += f":{parts.password}"
+        netloc = f"{userinfo}@{netloc}"
+
+    query = parts.query
+    if sort_query and query:
+        # Sort by name only; the stable sort keeps repeated parameters in order
+        pairs = parse_qsl(query, keep_blank_values=True)
+        query = urlencode(sorted(pairs, key=lambda pair: pair[0]))
+
+    fragment = '' if strip_fragment else parts.fragment
+    return urlunsplit((scheme, netloc, parts.path or '/', query, fragment))
+
+
+def make_key_func(sort_query=True, strip_fragment=True):
+    """Build a key function from the (type, url, options) of a request"""
+    def key_func(scrape_request):
+        options = {k: v for k, v in scrape_request.items() if k not in ('type', 'url')}
+        try:
+            options_key = json.dumps(options, sort_keys=True, default=str)
+            url_key = normalize_url(scrape_request.get('url'), sort_query=sort_query,
+                                    strip_fragment=strip_fragment)
+        except (TypeError, ValueError, AttributeError):
+            # Requests we cannot key reliably are never shared
+            return None
+        return (scrape_request.get('type'), url_key, options_key)
+    return key_func
+
+
+default_key = make_key_func()
+
+
+class _InFlightCall:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class RequestCoalescer:
+    def __init__(self, key_func=None, timeout=30.0, sort_query=True, strip_fragment=True, enabled=True):
+        # A custom key_func replaces the built-in URL normalization
+        self.key_func = key_func or make_key_func(sort_query=sort_query, strip_fragment=strip_fragment)
+        self.timeout = timeout
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._stats = {
+            'requests': 0,
+            'executed': 0,
+            'coalesced': 0,
+            'timeouts': 0
+        }
+
+    def run(self, scrape_request, func):
+        """Run func once per key; concurrent callers with the same key share its result"""
+        key = self.key_func(scrape_request) if self.enabled else None
+
+        with self._lock:
+            self._stats['requests'] += 1
+            if key is None:
+                self._stats['executed'] += 1
+                call, is_leader = None, True
+            else:
+                call = self._calls.get(key)
+                is_leader = call is None
+                if is_leader:
+                    call = _InFlightCall()
+                    self._calls[key] = call
+                    self._stats['executed'] += 1
+
+        if call is None:
+            return func()
+
+        if is_leader:
+            try:
+                call.result = func()
+                return call.result
+            except Exception as e:
+                call.error = e
+                raise
+            finally:
+                with self._lock:
+                    if self._calls.get(key) is call:
+                        del self._calls[key]
+                call.event.set()
+
+        if call.event.wait(self.timeout):
+            with self._lock:
+                self._stats['coalesced'] += 1
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        # The shared scrape is taking too long, fall back to our own fetch
+        with self._lock:
+            self._stats['timeouts'] += 1
+            self._stats['executed'] += 1
+        return func()
+
+    def get_stats(self):
+        """Return a snapshot of the coalescing counters"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['in_flight'] = len(self._calls)
+        return stats
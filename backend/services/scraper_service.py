@@ -1,22 +1,68 @@
 from scrapers.api_scraper import ApiScraper
 from scrapers.web_scraper import WebScraper
+from scrapers.extraction_rules import RuleRegistry
+from services.request_coalescer import RequestCoalescer
 
 
 class ScraperService:
-    def __init__(self):
+    def __init__(self, coalescer=None, rule_registry=None, sink=None):
         self.api_scraper = ApiScraper()
         self.web_scraper = WebScraper()
+        # Concurrent identical requests share a single in-flight scrape
+        self.coalescer = coalescer or RequestCoalescer()
+        # Named extraction rule sets, compiled once and shared across requests
+        self.rule_registry = rule_registry or RuleRegistry()
+        # Optional output sink that receives every scrape result
+        self.sink = sink
 
     def scrape(self, scrape_request):
         scrape_type = scrape_request.get('type')
         url = scrape_request.get('url')
+        rules = scrape_request.get('rules')
 
         if not url:
             return {"error": "URL is required"}
 
+        rule_set = None
+        if rules:
+            if scrape_type != 'static':
+                return {"error": "Extraction rules are only supported for 'static' scrapes."}
+            try:
+                rule_set = self.rule_registry.resolve(rules)
+            except ValueError as e:
+                return {"error": str(e)}
+
         if scrape_type == 'api':
-            return self.api_scraper.scrape(url)
+            return self.coalescer.run(scrape_request, lambda: self._export(url, self.api_scraper.scrape(url)))
         elif scrape_type == 'static':
-            return self.web_scraper.scrape(url)
+            return self.coalescer.run(
+                scrape_request, lambda: self._export(url, self.web_scraper.scrape(url, rule_set=rule_set)))
         else:
             return {"error": "Invalid scrape type. Use 'api' or 'static'."}
+
+    def _export(self, url, result):
+        # Runs inside the coalesced call so shared results are written once
+        if self.sink is not None:
+            self.sink.write(result, url=url)
+        return result
+
+    def register_rules(self, name, spec, replace=False):
+        try:
+            rule_set = self.rule_registry.register(name, spec, replace=replace)
+        except ValueError as e:
+            return {"error": str(e)}
+        return {"success": True, "rule_set": rule_set.describe()}
+
+    def list_rules(self):
+        return {"rule_sets": self.rule_registry.list()}
+
+    def get_stats(self):
+        return {
+            "coalescing": self.coalescer.get_stats(),
+            "selector_cache": self.rule_registry.cache.get_stats(),
+            "sink": self.sink.get_stats() if self.sink is not None else None
+        }
+
+    def close(self):
+        if self.sink is not None:
+            self.sink.close()
@@ -0,0 +1,3 @@
+# backend/sinks/__init__.py
+
+# This file is intentionally left blank.
\ No newline at end of file
@@ -0,0 +1,225 @@
+import abc
+import queue
+import threading
+import time
+import uuid
+
+
+class _FlushMarker:
+    def __init__(self, rotate=False):
+        self.rotate = rotate
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
+class BatchingSink(abc.ABC):
+    """Base class for output sinks that write scrape results from a background thread.
+
+    Results are queued by write() and handed to _write_batch() in batches of
+    up to batch_size, or every flush_interval seconds. The queue is bounded so
+    producers block (back-pressure) for up to put_timeout seconds instead of
+    buffering without limit. The current file is rotated once it is full or
+    max_age_seconds old, and quarantined if a write to it fails.
+    """
+
+    def __init__(self, batch_size=500, flush_interval=5.0, max_queue=10000, put_timeout=5.0,
+                 max_age_seconds=60.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.max_age_seconds = max_age_seconds
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        # Signalled when no write() or flush() is still queueing
+        self._idle = threading.Condition(self._lock)
+        self._in_flight = 0
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'queued': 0,
+            'written': 0,
+            'batches': 0,
+            'files': 0,
+            'backpressure_waits': 0,
+            'dropped': 0,
+            'failed': 0,
+            'quarantined': 0,
+            'errors': 0
+        }
+        self.last_error = None
+        self._closed = False
+        # Monotonic time the current file received its first batch
+        self._opened_at = None
+        self._thread = threading.Thread(target=self._run, name=type(self).__name__, daemon=True)
+        self._thread.start()
+
+    def _count(self, name, amount=1):
+        with self._stats_lock:
+            self._stats[name] += amount
+
+    def _begin_put(self):
+        with self._lock:
+            if self._closed:
+                return False
+            self._in_flight += 1
+            return True
+
+    def _end_put(self):
+        with self._lock:
+            self._in_flight -= 1
+            if not self._in_flight:
+                self._idle.notify_all()
+
+    def write(self, result, url=None):
+        """Queue a scrape result, waiting up to put_timeout while the queue is full.
+
+        Returns False if the result was dropped.
+        """
+        record = {
+            'result_id': uuid.uuid4().hex,
+            'scraped_at': time.time(),
+            'url': url,
+            'result': result
+        }
+        if not self._begin_put():
+            raise RuntimeError("Sink is closed.")
+        # Queue outside the lock so producers wait on a full queue in parallel
+        try:
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self._count('backpressure_waits')
+                try:
+                    self._queue.put(record, timeout=self.put_timeout)
+                except queue.Full:
+                    self._count('dropped')
+                    return False
+        finally:
+            self._end_put()
+        self._count('queued')
+        return True
+
+    def flush(self, rotate=False, timeout=None):
+        """Write out everything queued so far; with rotate=True also finalize the current file"""
+        marker = _FlushMarker(rotate)
+        if not self._begin_put():
+            # close() already drained the queue
+            return not self._thread.is_alive()
+        try:
+            self._queue.put(marker)
+        finally:
+            self._end_put()
+        return marker.done.wait(timeout)
+
+    def close(self, timeout=None):
+        """Drain the queue, finalize the current file and stop the writer thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            # Let puts that passed the closed check land ahead of the stop marker
+            while self._in_flight:
+                self._idle.wait()
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def get_stats(self):
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['pending'] = self._queue.qsize()
+        stats['last_error'] = self.last_error
+        return stats
+
+    def _next_timeout(self, flush_deadline):
+        deadline = flush_deadline
+        if self._opened_at is not None and self.max_age_seconds:
+            deadline = min(deadline, self._opened_at + self.max_age_seconds)
+        return max(0.0, deadline - time.monotonic())
+
+    def _run(self):
+        batch = []
+        flush_deadline = time.monotonic() + self.flush_interval
+
+        while True:
+            try:
+                item = self._queue.get(timeout=self._next_timeout(flush_deadline))
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, dict):
+                batch.append(item)
+                if len(batch) < self.batch_size and time.monotonic() < flush_deadline:
+                    continue
+
+            # Batch full, interval elapsed, file too old, flush requested or stopping
+            if batch:
+                self._write(batch)
+                batch = []
+            flush_deadline = time.monotonic() + self.flush_interval
+
+            if (self._opened_at is not None and self.max_age_seconds
+                    and time.monotonic() - self._opened_at >= self.max_age_seconds):
+                self._finalize()
+
+            if isinstance(item, _FlushMarker):
+                if item.rotate:
+                    self._finalize()
+                item.done.set()
+            elif item is _STOP:
+                self._finalize()
+                return
+
+    def _record_error(self, error):
+        self._count('errors')
+        self.last_error = f"{type(error).__name__}: {error}"
+
+    def _write(self, batch):
+        try:
+            self._write_batch(batch)
+        except Exception as e:
+            # The current file may be incomplete, move it aside and start a new one
+            self._record_error(e)
+            self._count('failed', len(batch))
+            self._discard()
+            return
+        if self._opened_at is None:
+            self._opened_at = time.monotonic()
+        self._count('written', len(batch))
+        self._count('batches')
+
+        if self._is_full():
+            self._finalize()
+
+    def _finalize(self):
+        self._opened_at = None
+        try:
+            if self._rotate():
+                self._count('files')
+        except Exception as e:
+            self._record_error(e)
+            self._discard()
+
+    def _discard(self):
+        self._opened_at = None
+        try:
+            if self._quarantine():
+                self._count('quarantined')
+        except Exception as e:
+            self._record_error(e)
+
+    @abc.abstractmethod
+    def _write_batch(self, records):
+        """Append a batch of queued records to the current file, opening one if needed"""
+
+    @abc.abstractmethod
+    def _is_full(self):
+        """Return True when the current file should be rotated"""
+
+    @abc.abstractmethod
+    def _rotate(self):
+        """Close the current file and move it into place; return True if a file was finalized"""
+
+    @abc.abstractmethod
+    def _quarantine(self):
+        """Close the current file and move it aside as failed; return True if a file was moved"""
@@ -0,0 +1,16 @@
+from sinks.jsonl_sink import JsonlSink
+from sinks.parquet_sink import ParquetSink
+
+
+SINKS = {
+    'jsonl': JsonlSink,
+    'parquet': ParquetSink
+}
+
+
+def create_sink(kind, directory, **options):
+    """Create an output sink by name ('jsonl' or 'parquet')"""
+    sink_class = SINKS.get(kind)
+    if sink_class is None:
+        raise ValueError(f"Unknown sink '{kind}'. Use one of: {', '.join(SINKS)}.")
+    return sink_class(directory, **options)
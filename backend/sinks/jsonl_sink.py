@@ -0,0 +1,82 @@
+import gzip
+import json
+import os
+import time
+
+from sinks.base import BatchingSink
+
+
+class JsonlSink(BatchingSink):
+    """Writes one JSON line per scrape result to rotating, optionally gzip-compressed files.
+
+    The current file is written as '<name>.part' and renamed into place when it
+    is rotated, so readers only ever see complete files. A file whose write
+    failed is renamed to '<name>.failed' instead.
+    """
+
+    def __init__(self, directory, prefix='results', compress=True, compresslevel=6,
+                 max_bytes=64 * 1024 * 1024, max_records=100000, **options):
+        self.directory = directory
+        self.prefix = prefix
+        self.compress = compress
+        self.compresslevel = compresslevel
+        self.max_bytes = max_bytes
+        self.max_records = max_records
+        self._file = None
+        self._path = None
+        self._bytes = 0
+        self._records = 0
+        self._sequence = 0
+        os.makedirs(directory, exist_ok=True)
+        super().__init__(**options)
+
+    def _open(self):
+        self._sequence += 1
+        extension = '.jsonl.gz' if self.compress else '.jsonl'
+        name = f"{self.prefix}-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}-{self._sequence:05d}{extension}"
+        self._path = os.path.join(self.directory, name)
+        part_path = self._path + '.part'
+        if self.compress:
+            self._file = gzip.open(part_path, 'wb', compresslevel=self.compresslevel)
+        else:
+            self._file = open(part_path, 'wb')
+        self._bytes = 0
+        self._records = 0
+
+    def _write_batch(self, records):
+        if self._file is None:
+            self._open()
+
+        # Serialize the whole batch and hand it to the file in a single write
+        lines = [json.dumps({
+            'result_id': record['result_id'],
+            'scraped_at': record['scraped_at'],
+            'url': record['url'],
+            **record['result']
+        }, default=str) for record in records]
+        payload = ('\n'.join(lines) + '\n').encode('utf-8')
+        self._file.write(payload)
+        self._bytes += len(payload)
+        self._records += len(records)
+
+    def _is_full(self):
+        return self._bytes >= self.max_bytes or self._records >= self.max_records
+
+    def _rotate(self):
+        if self._file is None:
+            return False
+        self._file.close()
+        os.replace(self._path + '.part', self._path)
+        self._file = None
+        return True
+
+    def _quarantine(self):
+        if self._file is None:
+            return False
+        file, self._file = self._file, None
+        try:
+            file.close()
+        except Exception:
+            pass
+        os.replace(self._path + '.part', self._path + '.failed')
+        return True
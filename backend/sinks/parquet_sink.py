@@ -0,0 +1,202 @@
+import json
+import os
+import time
+
+from sinks.base import BatchingSink
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is only available when pyarrow is installed
+    pa = None
+    pq = None
+
+
+def _schemas():
+    return {
+        'results': pa.schema([
+            ('result_id', pa.string()),
+            ('scraped_at', pa.float64()),
+            ('type', pa.string()),
+            ('url', pa.string()),
+            ('success', pa.bool_()),
+            ('error', pa.string()),
+            ('title', pa.string()),
+            ('rule_set', pa.string()),
+            # JSON text for API payloads and extracted records
+            ('payload', pa.string())
+        ]),
+        'analytics': pa.schema([
+            ('result_id', pa.string()),
+            ('metric', pa.string()),
+            ('value', pa.float64()),
+            ('text', pa.string())
+        ]),
+        'links': pa.schema([
+            ('result_id', pa.string()),
+            ('text', pa.string()),
+            ('href', pa.string()),
+            ('is_external', pa.bool_())
+        ]),
+        'headings': pa.schema([
+            ('result_id', pa.string()),
+            ('level', pa.string()),
+            ('text', pa.string())
+        ]),
+        'images': pa.schema([
+            ('result_id', pa.string()),
+            ('src', pa.string()),
+            ('alt', pa.string()),
+            ('width', pa.string()),
+            ('height', pa.string())
+        ])
+    }
+
+
+def flatten_result(record):
+    """Split one queued scrape result into rows for each Parquet table"""
+    result_id = record['result_id']
+    result = record['result']
+    data = result.get('data')
+    page = data if isinstance(data, dict) and result.get('type') == 'static' else {}
+
+    payload = None
+    if result.get('type') == 'api' and data is not None:
+        payload = data if isinstance(data, str) else json.dumps(data, default=str)
+    elif 'records' in page:
+        payload = json.dumps(page['records'], default=str)
+
+    rows = {
+        'results': [{
+            'result_id': result_id,
+            'scraped_at': record['scraped_at'],
+            'type': result.get('type'),
+            'url': page.get('url') or record.get('url'),
+            'success': bool(result.get('success')),
+            'error': result.get('error'),
+            'title': page.get('title'),
+            'rule_set': page.get('rule_set'),
+            'payload': payload
+        }],
+        'analytics': [],
+        'links': [],
+        'headings': [],
+        'images': []
+    }
+
+    for metric, value in (result.get('analytics') or {}).items():
+        row = {'result_id': result_id, 'metric': metric, 'value': None, 'text': None}
+        if isinstance(value, (int, float)):
+            row['value'] = float(value)
+        elif isinstance(value, str):
+            row['text'] = value
+        else:
+            row['text'] = json.dumps(value, default=str)
+        rows['analytics'].append(row)
+
+    for link in page.get('links', []):
+        rows['links'].append({
+            'result_id': result_id,
+            'text': link.get('text'),
+            'href': link.get('href'),
+            'is_external': link.get('is_external')
+        })
+
+    for heading in page.get('headings', []):
+        rows['headings'].append({
+            'result_id': result_id,
+            'level': heading.get('level'),
+            'text': heading.get('text')
+        })
+
+    for image in page.get('images', []):
+        rows['images'].append({
+            'result_id': result_id,
+            'src': image.get('src'),
+            'alt': image.get('alt'),
+            'width': str(image.get('width', '')),
+            'height': str(image.get('height', ''))
+        })
+
+    return rows
+
+
+class ParquetSink(BatchingSink):
+    """Writes scrape results as columnar Parquet tables (results, analytics, links, headings, images).
+
+    Each table lives in its own subdirectory and shares <table>/<name>.parquet
+    file names per rotation, so rows can be joined on result_id. Every batch is
+    written as one row group to '<name>.parquet.part', renamed into place on rotation.
+    If a write fails, every table of the current rotation is renamed to '.failed'.
+    """
+
+    def __init__(self, directory, prefix='results', compression='snappy',
+                 max_records=100000, **options):
+        if pa is None:
+            raise ImportError("Parquet output requires pyarrow to be installed.")
+        self.directory = directory
+        self.prefix = prefix
+        self.compression = compression
+        self.max_records = max_records
+        self.schemas = _schemas()
+        self._writers = {}
+        self._name = None
+        self._records = 0
+        self._sequence = 0
+        for table in self.schemas:
+            os.makedirs(os.path.join(directory, table), exist_ok=True)
+        super().__init__(**options)
+
+    def _path(self, table):
+        return os.path.join(self.directory, table, self._name)
+
+    def _open(self):
+        self._sequence += 1
+        self._name = f"{self.prefix}-{os.getpid()}-{time.strftime('%Y%m%d-%H%M%S')}-{self._sequence:05d}.parquet"
+        self._records = 0
+        for table, schema in self.schemas.items():
+            self._writers[table] = pq.ParquetWriter(
+                self._path(table) + '.part', schema, compression=self.compression)
+
+    def _write_batch(self, records):
+        if not self._writers:
+            self._open()
+
+        columns = {table: [] for table in self.schemas}
+        for record in records:
+            for table, rows in flatten_result(record).items():
+                columns[table].extend(rows)
+
+        for table, rows in columns.items():
+            if rows:
+                self._writers[table].write_table(
+                    pa.Table.from_pylist(rows, schema=self.schemas[table]))
+        self._records += len(records)
+
+    def _is_full(self):
+        return self._records >= self.max_records
+
+    def _rotate(self):
+        if not self._writers:
+            return False
+        for writer in self._writers.values():
+            writer.close()
+        # Tables are renamed together once all of them are complete
+        for table in self.schemas:
+            os.replace(self._path(table) + '.part', self._path(table))
+        self._writers = {}
+        return True
+
+    def _quarantine(self):
+        if not self._writers:
+            return False
+        writers, self._writers = self._writers, {}
+        for writer in writers.values():
+            try:
+                writer.close()
+            except Exception:
+                pass
+        # Move every table aside so no partial set can be joined on result_id
+        for table in writers:
+            os.replace(self._path(table) + '.part', self._path(table) + '.failed')
+        return True
@@ -0,0 +1,116 @@
+import unittest
+from backend.scrapers.extraction_rules import RuleRegistry, RuleSet, SelectorCache, lxml_html
+
+HTML = """
+<html><body>
+  <!-- catalogue -->
+  <h1 class="title"> Product   list </h1>
+  <table>
+    <tr class="product"><td class="name">Lamp</td><td class="price">$12.50</td><td><a href="/lamp">more</a></td></tr>
+    <tr class="product"><td class="name">Desk</td><td class="price">$99</td><td><a href="/desk">more</a></td></tr>
+  </table>
+</body></html>
+"""
+
+class TestExtractionRules(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = SelectorCache(maxsize=2)
+
+    def test_document_fields(self):
+        rule_set = RuleSet.from_dict({'fields': {
+            'title': 'h1.title',
+            'prices': {'css': 'td.price', 'regex': r'[\d.]+', 'multiple': True}
+        }}, self.cache)
+        self.assertEqual(rule_set.extract(HTML), [{'title': 'Product list', 'prices': ['12.50', '99']}])
+
+    def test_item_records(self):
+        rule_set = RuleSet.from_dict({
+            'items': {'css': 'tr.product'},
+            'fields': {
+                'name': 'td.name',
+                'link': {'css': 'a', 'extract': 'attr:href'}
+            }
+        }, self.cache)
+        self.assertEqual(rule_set.extract(HTML), [
+            {'name': 'Lamp', 'link': '/lamp'},
+            {'name': 'Desk', 'link': '/desk'}
+        ])
+
+    def test_first_match_without_value_is_skipped(self):
+        html = '<a name="x">top</a><a href="/y">y</a><p>Price: n/a</p><p>Price: $5</p>'
+        rule_set = RuleSet.from_dict({'fields': {
+            'link': {'css': 'a', 'extract': 'attr:href'},
+            'price': {'css': 'p', 'regex': r'\$(\d+)'}
+        }}, self.cache)
+        self.assertEqual(rule_set.extract(html), [{'link': '/y', 'price': '5'}])
+
+    def test_scope_refers_to_item(self):
+        html = '<ul class="i"><li>1</li></ul><ul class="i"><li>2</li></ul>'
+        rule_set = RuleSet.from_dict({'items': 'ul.i', 'fields': {'v': ':scope > li'}}, self.cache)
+        self.assertEqual(rule_set.extract(html), [{'v': '1'}, {'v': '2'}])
+
+    def test_selector_cache_is_lru(self):
+        first = self.cache.get('css', 'h1')
+        self.assertIs(self.cache.get('css', 'h1'), first)
+        self.cache.get('css', 'td')
+        self.cache.get('css', 'a')
+        self.assertEqual(self.cache.get_stats()['size'], 2)
+        self.assertEqual(self.cache.get_stats()['hits'], 1)
+        self.cache.get('css', 'h1')
+        self.assertEqual(self.cache.get_stats()['misses'], 4)
+
+    def test_invalid_rules(self):
+        with self.assertRaises(ValueError):
+            RuleSet.from_dict({'fields': {}}, self.cache)
+        with self.assertRaises(ValueError):
+            RuleSet.from_dict({'fields': {'x': {'css': 'a', 'extract': 'attr:'}}}, self.cache)
+        with self.assertRaises(ValueError):
+            RuleSet.from_dict({'fields': {'x': {'css': 'a['}}}, self.cache)
+        with self.assertRaises(ValueError):
+            RuleSet.from_dict({'fields': {'x': {'css': 5}}}, self.cache)
+        with self.assertRaises(ValueError):
+            RuleSet.from_dict({'fields': {'x': {'css': 'a', 'multiple': 'false'}}}, self.cache)
+        with self.assertRaises(ValueError):
+            RuleSet.from_dict({'fields': {'x': {'css': 'a', 'regex': '(a+)+' * 50}}}, self.cache)
+
+    @unittest.skipUnless(lxml_html, "lxml is not installed")
+    def test_xpath_rules(self):
+        rule_set = RuleSet.from_dict({'fields': {
+            'comment': {'xpath': '//comment()'},
+            'names': {'xpath': '//td[@class="name"]', 'multiple': True},
+            'title': 'h1'
+        }}, self.cache)
+        self.assertEqual(rule_set.extract(HTML, HTML.encode('utf-8')),
+                         [{'comment': 'catalogue', 'names': ['Lamp', 'Desk'], 'title': 'Product list'}])
+
+    def test_registry(self):
+        registry = RuleRegistry(self.cache)
+        registry.register('titles', {'fields': {'title': 'h1'}})
+        self.assertIs(registry.resolve('titles'), registry.get('titles'))
+        self.assertEqual(registry.list(), [{'name': 'titles', 'fields': ['title'], 'has_items': False}])
+        with self.assertRaises(ValueError):
+            registry.resolve('missing')
+        with self.assertRaises(ValueError):
+            registry.register('titles', {'fields': {'title': 'h2'}})
+        registry.register('titles', {'fields': {'heading': 'h2'}}, replace=True)
+        self.assertEqual(registry.get('titles').describe()['fields'], ['heading'])
+        with self.assertRaises(ValueError):
+            registry.register(['x'], {'fields': {'title': 'h1'}})
+
+    def test_regex_only_in_registered_rule_sets(self):
+        registry = RuleRegistry(self.cache)
+        spec = {'fields': {'price': {'css': 'td.price', 'regex': r'[\d.]+'}}}
+        with self.assertRaises(ValueError):
+            registry.resolve(spec)
+        registry.register('prices', spec)
+        self.assertEqual(registry.resolve('prices').extract(HTML), [{'price': '12.50'}])
+
+    def test_registry_size_is_capped(self):
+        registry = RuleRegistry(self.cache, max_rule_sets=1)
+        registry.register('one', {'fields': {'title': 'h1'}})
+        with self.assertRaises(ValueError):
+            registry.register('two', {'fields': {'title': 'h1'}})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import threading
+import time
+import unittest
+from backend.services.request_coalescer import RequestCoalescer, default_key, normalize_url
+
+class TestRequestCoalescer(unittest.TestCase):
+
+    def setUp(self):
+        self.coalescer = RequestCoalescer(timeout=5)
+
+    def test_normalize_url(self):
+        self.assertEqual(normalize_url("HTTP://Example.com:80/?b=2&a=1#top"),
+                         "http://example.com/?a=1&b=2")
+        self.assertEqual(normalize_url("https://example.com:8443"),
+                         "https://example.com:8443/")
+        self.assertEqual(normalize_url("http://example.com/?b=1&a=2&a=1"),
+                         "http://example.com/?a=2&a=1&b=1")
+        self.assertNotEqual(normalize_url("http://example.com/?a=2&a=1"),
+                            normalize_url("http://example.com/?a=1&a=2"))
+
+    def test_configurable_normalization(self):
+        coalescer = RequestCoalescer(sort_query=False, strip_fragment=False)
+        request = {'type': 'static', 'url': 'http://example.com/?b=1&a=2#top'}
+        self.assertEqual(coalescer.key_func(request)[1], "http://example.com/?b=1&a=2#top")
+
+    def test_default_key_includes_options(self):
+        base = {'type': 'static', 'url': 'http://example.com'}
+        self.assertEqual(default_key(base), default_key({'url': 'http://EXAMPLE.com/', 'type': 'static'}))
+        self.assertNotEqual(default_key(base), default_key(dict(base, type='api')))
+        self.assertNotEqual(default_key(base), default_key(dict(base, timeout=5)))
+        self.assertNotEqual(default_key(base), default_key(dict(base, rules='prices')))
+
+    def test_concurrent_requests_share_one_call(self):
+        calls = []
+        started = threading.Event()
+        release = threading.Event()
+
+        def fetch():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"success": True}
+
+        results = []
+        request = {'type': 'static', 'url': 'http://example.com'}
+        leader = threading.Thread(target=lambda: results.append(self.coalescer.run(request, fetch)))
+        leader.start()
+        started.wait(5)
+        waiters = [threading.Thread(target=lambda: results.append(self.coalescer.run(request, fetch)))
+                   for _ in range(4)]
+        for t in waiters:
+            t.start()
+        # Release the leader only once every waiter has joined the call
+        deadline = time.monotonic() + 5
+        while self.coalescer.get_stats()['requests'] < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        release.set()
+        for t in [leader] + waiters:
+            t.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(r is results[0] for r in results))
+        stats = self.coalescer.get_stats()
+        self.assertEqual(stats['requests'], 5)
+        self.assertEqual(stats['coalesced'], 4)
+        self.assertEqual(stats['in_flight'], 0)
+
+    def test_waiter_falls_back_after_timeout(self):
+        coalescer = RequestCoalescer(timeout=0.05)
+        release = threading.Event()
+        started = threading.Event()
+        request = {'type': 'api', 'url': 'http://example.com/data'}
+
+        def slow():
+            started.set()
+            release.wait(5)
+            return "leader"
+
+        leader = threading.Thread(target=coalescer.run, args=(request, slow))
+        leader.start()
+        started.wait(5)
+        self.assertEqual(coalescer.run(request, lambda: "own"), "own")
+        release.set()
+        leader.join(5)
+        self.assertEqual(coalescer.get_stats()['timeouts'], 1)
+
+    def test_leader_error_clears_in_flight_call(self):
+        with self.assertRaises(RuntimeError):
+            self.coalescer.run({'type': 'api', 'url': 'http://x.com'},
+                               lambda: (_ for _ in ()).throw(RuntimeError("boom")))
+        self.assertEqual(self.coalescer.get_stats()['in_flight'], 0)
+
+if __name__ == '__main__':
+    unittest.main()
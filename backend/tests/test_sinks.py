@@ -0,0 +1,163 @@
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from backend.sinks.jsonl_sink import JsonlSink
+from backend.sinks.parquet_sink import ParquetSink, flatten_result, pq
+
+RESULT = {
+    "success": True,
+    "data": {
+        "url": "http://example.com",
+        "title": "Example",
+        "links": [{"text": "More", "href": "http://example.com/more", "is_external": False}],
+        "headings": [{"level": "h1", "text": "Example"}],
+        "images": []
+    },
+    "analytics": {"links_count": 1, "content_type": "text/html"},
+    "type": "static"
+}
+
+class TestJsonlSink(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def read_lines(self):
+        lines = []
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith('.jsonl.gz'):
+                continue
+            with gzip.open(os.path.join(self.directory, name), 'rt') as f:
+                lines.extend(json.loads(line) for line in f)
+        return lines
+
+    def test_writes_batches_and_finalizes_on_close(self):
+        sink = JsonlSink(self.directory, batch_size=2, flush_interval=60)
+        for _ in range(3):
+            self.assertTrue(sink.write(RESULT, url="http://example.com"))
+        sink.flush()
+        # The current file stays hidden until rotation
+        self.assertTrue(all(name.endswith('.part') for name in os.listdir(self.directory)))
+        sink.close()
+
+        lines = self.read_lines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[0]['data']['title'], "Example")
+        self.assertEqual(sink.get_stats()['written'], 3)
+        self.assertEqual(sink.get_stats()['files'], 1)
+
+    def test_rotates_by_record_count(self):
+        sink = JsonlSink(self.directory, batch_size=1, max_records=2, flush_interval=60)
+        for _ in range(5):
+            sink.write(RESULT)
+        sink.close()
+        self.assertEqual(len(os.listdir(self.directory)), 3)
+        self.assertEqual(len(self.read_lines()), 5)
+
+    def test_rotates_by_age(self):
+        sink = JsonlSink(self.directory, batch_size=1, flush_interval=60, max_age_seconds=0.1)
+        self.addCleanup(sink.close)
+        sink.write(RESULT)
+        deadline = time.monotonic() + 5
+        while not self.read_lines() and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(len(self.read_lines()), 1)
+        self.assertEqual(sink.get_stats()['files'], 1)
+
+    def test_failed_write_quarantines_file(self):
+        sink = JsonlSink(self.directory, batch_size=1, flush_interval=60)
+        sink.write(RESULT)
+        sink.write({('not', 'a', 'string', 'key'): 1})
+        sink.write(RESULT)
+        sink.close()
+
+        names = sorted(os.listdir(self.directory))
+        self.assertEqual(len([n for n in names if n.endswith('.failed')]), 1)
+        self.assertEqual(len(self.read_lines()), 1)
+        stats = sink.get_stats()
+        self.assertEqual((stats['errors'], stats['failed'], stats['quarantined']), (1, 1, 1))
+
+    def test_concurrent_producers_wait_in_parallel(self):
+        class SlowSink(JsonlSink):
+            def _write_batch(self, records):
+                time.sleep(1)
+                super()._write_batch(records)
+
+        sink = SlowSink(self.directory, batch_size=1, max_queue=1, put_timeout=0.3, flush_interval=60)
+        sink.write(RESULT)
+        # Let the writer thread take the first result and start its slow write
+        deadline = time.monotonic() + 5
+        while sink.get_stats()['pending'] and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        elapsed = []
+
+        def produce():
+            start = time.monotonic()
+            sink.write(RESULT)
+            elapsed.append(time.monotonic() - start)
+
+        producers = [threading.Thread(target=produce) for _ in range(4)]
+        for t in producers:
+            t.start()
+        for t in producers:
+            t.join(5)
+        sink.close()
+
+        self.assertEqual(len(elapsed), 4)
+        self.assertLess(max(elapsed), 0.6)
+        stats = sink.get_stats()
+        self.assertEqual(stats['queued'] + stats['dropped'], 5)
+        self.assertEqual(stats['written'], stats['queued'])
+        self.assertEqual(len(self.read_lines()), stats['queued'])
+
+    def test_closed_sink(self):
+        sink = JsonlSink(self.directory)
+        sink.close()
+        self.assertTrue(sink.flush())
+        with self.assertRaises(RuntimeError):
+            sink.write(RESULT)
+
+class TestParquetSink(unittest.TestCase):
+
+    def test_flatten_result(self):
+        rows = flatten_result({'result_id': 'abc', 'scraped_at': 1.0, 'url': None, 'result': RESULT})
+        self.assertEqual(rows['results'][0]['url'], "http://example.com")
+        self.assertEqual(rows['links'][0]['href'], "http://example.com/more")
+        self.assertEqual(len(rows['headings']), 1)
+        self.assertEqual(rows['images'], [])
+        analytics = {row['metric']: row for row in rows['analytics']}
+        self.assertEqual(analytics['links_count']['value'], 1.0)
+        self.assertEqual(analytics['content_type']['text'], "text/html")
+
+    @unittest.skipUnless(pq, "pyarrow is not installed")
+    def test_round_trip(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        sink = ParquetSink(directory, batch_size=2, max_records=2, flush_interval=60)
+        for _ in range(3):
+            sink.write(RESULT)
+        sink.close()
+
+        tables = {}
+        for table in ('results', 'analytics', 'links', 'headings', 'images'):
+            names = sorted(os.listdir(os.path.join(directory, table)))
+            self.assertEqual(len(names), 2)
+            self.assertTrue(all(name.endswith('.parquet') for name in names))
+            tables[table] = pq.read_table(os.path.join(directory, table)).to_pylist()
+
+        result_ids = {row['result_id'] for row in tables['results']}
+        self.assertEqual(len(result_ids), 3)
+        for table in ('analytics', 'links', 'headings'):
+            self.assertEqual({row['result_id'] for row in tables[table]}, result_ids)
+        self.assertEqual(tables['images'], [])
+        self.assertEqual(tables['links'][0]['href'], "http://example.com/more")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -20,4 +20,11 @@ def format_error(message):
     return {
         "status": "error",
         "message": message
-    }
\ No newline at end of file
+    }
+
+def env_flag(name, default=False):
+    import os
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')